@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""Bake the frozen ALM actor into actor_scripted.pt.
+
+inference.py loads that file with a single torch.jit.load when it exists. Re-run
+after changing actor_weights.pth.
+
+Usage (from the repo root): python agents/alm/export.py
+"""
+import sys
+
+import torch
+
+from inference import SCRIPTED_PATH, build_agent
+
+
+def main() -> None:
+    with torch.inference_mode():
+        agent = build_agent(torch.device("cpu"))
+    torch.jit.save(agent, SCRIPTED_PATH)
+    print(f"Saved scripted actor to {SCRIPTED_PATH}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
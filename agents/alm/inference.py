@@ -1,61 +1,200 @@
 #!/usr/bin/env python3
-import json
+import contextlib
 import os
+import select
 import sys
+import warnings
+from typing import Dict, Iterator, List, Optional
+
+# Read by OpenMP/oneDNN when torch is first imported, so they must be set before it.
+# Requests are tiny, so a single thread avoids spinning up (and syncing) a pool.
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("ONEDNN_VERBOSE", "0")
+os.environ.setdefault("MKLDNN_VERBOSE", "0")
+
+import orjson
 import torch
 
 from model import actor as AlmActor
 
+OBS_DIM = 4
+ACTION_DIM = 2
+MAX_BATCH = 64
+READ_CHUNK = 1 << 16
+# Largest magnitude an observation value may have; anything above it would be cast
+# to inf when written into the float32 buffer.
+FLOAT32_MAX = torch.finfo(torch.float32).max
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+WEIGHTS_PATH = os.path.join(BASE_DIR, "actor_weights.pth")
+# Written by export.py.
+SCRIPTED_PATH = os.path.join(BASE_DIR, "actor_scripted.pt")
+
+
+@contextlib.contextmanager
+def _quiet_torchscript() -> Iterator[None]:
+    # Recent torch releases flag the TorchScript APIs as deprecated on every call, and
+    # the driver relays stderr into each simulation's log. The TracerWarning for the
+    # shape check in forward is expected: the traced shape is always (1, 4).
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=FutureWarning, module=r"torch\.jit\.")
+        warnings.filterwarnings("ignore", category=torch.jit.TracerWarning)
+        yield
+
+
+def _freeze_agent(agent: AlmActor) -> torch.jit.ScriptModule:
+    # Trace with the fixed (1, 4) observation shape and freeze, so weights become
+    # graph constants and the whole MLP runs without re-entering Python per layer.
+    example = torch.zeros(1, OBS_DIM, dtype=torch.float32)
+    with _quiet_torchscript():
+        scripted = torch.jit.trace(agent, example)
+        scripted = torch.jit.freeze(scripted)
+        return torch.jit.optimize_for_inference(scripted)
+
+
+def build_agent(device: torch.device) -> torch.jit.ScriptModule:
+    agent = AlmActor(obs_dim=OBS_DIM, action_dim=ACTION_DIM)
+    agent.set_initial_state(WEIGHTS_PATH, device=device)
+    agent.eval()
+    return _freeze_agent(agent)
+
 
-def _load_agent(device: torch.device) -> AlmActor:
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    weights_path = os.path.join(base_dir, "actor_weights.pth")
+def _warm_up(agent: torch.jit.ScriptModule, device: torch.device) -> None:
+    # Pay the one-off first-call costs (executor setup, kernel creation) up front.
+    example = torch.zeros(1, OBS_DIM, dtype=torch.float32, device=device)
+    for _ in range(2):
+        agent(example)
 
-    agent = AlmActor(obs_dim=4, action_dim=2)
-    agent.set_initial_state(weights_path, device=device)
-    agent.eval()
+
+def _load_agent(device: torch.device) -> torch.jit.ScriptModule:
+    # Prefer the pre-baked graph: a single torch.jit.load, no module construction
+    # or state_dict matching. Fall back to building it from the weights when the file
+    # is missing, older than the weights, or does not load and run.
+    if os.path.exists(SCRIPTED_PATH) and os.path.getmtime(SCRIPTED_PATH) >= os.path.getmtime(WEIGHTS_PATH):
+        try:
+            with _quiet_torchscript():
+                agent = torch.jit.load(SCRIPTED_PATH, map_location=device)
+            _warm_up(agent, device)
+            return agent
+        except Exception as exc:  # pylint: disable=broad-except
+            print(f"Ignoring {SCRIPTED_PATH}: {exc}", file=sys.stderr)
+
+    agent = build_agent(device)
+    _warm_up(agent, device)
     return agent
 
 
-def main() -> None:
-    device = torch.device("cpu")
-    torch.set_grad_enabled(False)
-    torch.manual_seed(0)
+def _read_batches(max_lines: int = MAX_BATCH) -> Iterator[List[bytes]]:
+    """Yield stdin lines in groups, coalescing whatever the driver has already sent.
 
-    agent = _load_agent(device)
+    Blocks only until at least one complete line is available and never waits to
+    fill a batch, so a strict request/response driver still gets one reply per line.
+    """
+    fd = sys.stdin.fileno()
+    buffered = b""
+    while True:
+        chunk = os.read(fd, READ_CHUNK)
+        buffered += chunk
+        while chunk and buffered.count(b"\n") < max_lines and select.select([fd], [], [], 0)[0]:
+            chunk = os.read(fd, READ_CHUNK)
+            buffered += chunk
 
-    for line in sys.stdin:
-        line = line.strip()
-        if not line:
-            continue
+        eof = not chunk
+        lines = buffered.split(b"\n")
+        buffered = lines.pop()
+        if eof and buffered:
+            lines.append(buffered)
 
-        try:
-            payload = json.loads(line)
-        except json.JSONDecodeError:
-            print(json.dumps({"error": "invalid_json"}), flush=True)
-            continue
+        for start in range(0, len(lines), max_lines):
+            yield lines[start:start + max_lines]
+        if eof:
+            return
 
-        cmd = payload.get("type")
-        if cmd == "reset":
-            print(json.dumps({"status": "reset"}), flush=True)
-            continue
 
-        if cmd != "infer":
-            print(json.dumps({"error": "unknown_command"}), flush=True)
-            continue
+def _write_responses(responses: List[Dict[str, object]]) -> None:
+    # Bytes straight to the underlying buffer: no str decode/encode round trip.
+    out = sys.stdout.buffer
+    out.write(b"".join(orjson.dumps(response, option=orjson.OPT_APPEND_NEWLINE) for response in responses))
+    out.flush()
 
-        obs = payload.get("obs")
-        if not isinstance(obs, list) or len(obs) != agent.obs_dim:
-            print(json.dumps({"error": "invalid_observation"}), flush=True)
-            continue
 
-        try:
-            action = agent.act(obs, device=device, deterministic=True)
-        except Exception as exc:  # pylint: disable=broad-except
-            print(json.dumps({"error": str(exc)}), flush=True)
-            continue
+# inference_mode also skips autograd version counters and view tracking per op.
+@torch.inference_mode()
+def main() -> None:
+    device = torch.device("cpu")
+    torch.manual_seed(0)
+    # A (1, 4) observation is far too small to benefit from intra-op threads.
+    torch.set_num_threads(1)
+
+    agent = _load_agent(device)
 
-        print(json.dumps({"action": int(action)}), flush=True)
+    # Observation rows reused for every batch; obs_view aliases the tensor memory so
+    # filling it from the parsed JSON lists allocates no new tensor.
+    obs_buf = torch.empty(MAX_BATCH, OBS_DIM, dtype=torch.float32, device=device)
+    obs_view = obs_buf.numpy()
+
+    # The graph was frozen and optimised at load time; skip the executor's profiling
+    # and re-specialisation passes while serving. (Tracing itself needs them on.)
+    with torch.jit.optimized_execution(False):
+        for lines in _read_batches():
+            responses: List[Optional[Dict[str, object]]] = []
+            # responses index for each filled row of obs_buf
+            rows: List[int] = []
+
+            for line in lines:
+                line = line.strip()
+                if not line:
+                    continue
+
+                try:
+                    payload = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    responses.append({"error": "invalid_json"})
+                    continue
+                # Valid JSON that is not an object (e.g. [1, 2]) is not a request either; it
+                # must still get its own reply, or the rest of the batch would be lost with it.
+                if not isinstance(payload, dict):
+                    responses.append({"error": "invalid_json"})
+                    continue
+
+                cmd = payload.get("type")
+                if cmd == "reset":
+                    responses.append({"status": "reset"})
+                    continue
+
+                if cmd != "infer":
+                    responses.append({"error": "unknown_command"})
+                    continue
+
+                obs = payload.get("obs")
+                if not isinstance(obs, list) or len(obs) != OBS_DIM:
+                    responses.append({"error": "invalid_observation"})
+                    continue
+
+                # The buffer write would turn null into NaN and parse numeric strings,
+                # so only finite numbers are let through (NaN fails the comparison).
+                if not all(isinstance(value, (int, float)) and abs(value) <= FLOAT32_MAX for value in obs):
+                    responses.append({"error": "invalid_observation"})
+                    continue
+
+                obs_view[len(rows)] = obs
+
+                rows.append(len(responses))
+                responses.append(None)
+
+            # Each row runs on its own so a reply never depends on which requests it was
+            # coalesced with (GEMM kernels for different batch sizes need not round
+            # identically); reads, parsing and the stdout flush stay batched.
+            for row, idx in enumerate(rows):
+                try:
+                    action = int(agent(obs_buf[row : row + 1]).argmax(-1).item())
+                except Exception as exc:  # pylint: disable=broad-except
+                    responses[idx] = {"error": str(exc)}
+                    continue
+                responses[idx] = {"action": action}
+
+            if responses:
+                _write_responses(responses)
 
 
 if __name__ == "__main__":
@@ -70,16 +70,15 @@ class actor(nn.Module):
         elif not torch.is_tensor(obs):
             obs = torch.tensor(obs, dtype=torch.float32, device=device)
 
-        with torch.no_grad():
+        with torch.inference_mode():
             logits = self.forward(obs)
-            dist = torch.distributions.Categorical(logits=logits)
 
-            if deterministic:
-                action = torch.argmax(dist.logits, dim=-1)
+            if not deterministic:
+                action = Categorical(logits=logits).sample()
             else:
-                action = dist.sample()
+                action = torch.argmax(logits, dim=-1)
 
-        return action.squeeze().cpu().numpy().item()
+        return int(action.item())
     
     def set_initial_state(self, file_path, device = "cpu"):
         state = torch.load(file_path, map_location = device, weights_only=True)
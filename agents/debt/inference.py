@@ -1,13 +1,23 @@
 #!/usr/bin/env python3
-import json
 import math
+import os
+import select
 import sys
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import orjson
 
 OBS_DIM = 10
 LEVERAGE_BOTTOM = 1.8
 LEVERAGE_TOP = 2.2
 LEVERAGE_RANGE = LEVERAGE_TOP - LEVERAGE_BOTTOM
+MAX_BATCH = 64
+READ_CHUNK = 1 << 16
+# Decisions served by the plain-Python kernel before it is handed to Numba. Importing
+# numba and compiling costs ~0.5 s at ~2.7 us saved per decision, so it only pays
+# off after ~185k decisions: a full MINUTELY backtest makes ~2.4M, a FOUR_HOURLY
+# brute-force run only ~10k.
+JIT_AFTER = 200_000
 
 
 def _zero_center(value: float) -> float:
@@ -23,33 +33,18 @@ def _clamp01(value: float) -> float:
     return max(0.0, min(1.0, value))
 
 
-def _decide_action(obs: List[float], state: Dict[str, float]) -> int:
-    (
-        leverage_norm,
-        cr_norm,
-        leverage_mean_norm,
-        leverage_slope_norm,
-        vol_ratio,
-        vol_mean,
-        vol_slope_norm,
-        calm_part,
-        calm_mean,
-        calm_slope_norm,
-    ) = obs
-
-    leverage_norm = _clamp01(leverage_norm)
-    cr_norm = _clamp01(cr_norm)
-    leverage_mean_norm = _clamp01(leverage_mean_norm)
-    vol_ratio = _clamp01(vol_ratio)
-    vol_mean = _clamp01(vol_mean)
-    calm_part = _clamp01(calm_part)
-    calm_mean = _clamp01(calm_mean)
-
-    leverage_slope = _zero_center(leverage_slope_norm)
-    vol_slope = _zero_center(vol_slope_norm)
-    calm_slope = _zero_center(calm_slope_norm)
-
-    last_action = state.get("last_action", 1)
+def _decide_action_kernel(obs: Sequence[float], last_action: int) -> int:
+    leverage_norm = _clamp01(obs[0])
+    cr_norm = _clamp01(obs[1])
+    leverage_mean_norm = _clamp01(obs[2])
+    vol_ratio = _clamp01(obs[4])
+    vol_mean = _clamp01(obs[5])
+    calm_part = _clamp01(obs[7])
+    calm_mean = _clamp01(obs[8])
+
+    leverage_slope = _zero_center(obs[3])
+    vol_slope = _zero_center(obs[6])
+    calm_slope = _zero_center(obs[9])
 
     increase_pressure = (
         (0.35 - leverage_norm) * 2.0
@@ -95,13 +90,61 @@ def _decide_action(obs: List[float], state: Dict[str, float]) -> int:
     else:
         if abs(leverage_slope) < 0.05 and abs(vol_slope) < 0.05:
             target_action = last_action
-        elif last_action in (2, 3):
+        elif last_action == 2 or last_action == 3:
             target_action = 1
         else:
             target_action = 1
 
+    return target_action
+
+
+def _jit_kernel() -> Optional[Callable[[List[float], int], int]]:
+    """Compile the decision kernel with numba; None keeps the interpreted one."""
+    # Imported here so short sessions never pay for numpy/numba at startup.
+    try:
+        import numpy as np
+        from numba import njit
+    except ImportError as exc:
+        print(f"numba unavailable, keeping the interpreted kernel: {exc}", file=sys.stderr)
+        return None
+
+    # numba resolves the helpers the kernel calls through the module globals when it
+    # compiles it, so the compiled helpers are swapped in for the compile and swapped
+    # back out if it fails.
+    global _zero_center, _clamp01
+    interpreted = (_zero_center, _clamp01)
+    try:
+        _zero_center = njit(cache=True)(_zero_center)
+        _clamp01 = njit(cache=True)(_clamp01)
+        compiled = njit(cache=True)(_decide_action_kernel)
+        # njit compiles lazily; force it now so a failure surfaces here.
+        compiled(np.zeros(OBS_DIM, dtype=np.float64), 1)
+    except Exception as exc:  # pylint: disable=broad-except
+        _zero_center, _clamp01 = interpreted
+        print(f"numba compilation failed, keeping the interpreted kernel: {exc}", file=sys.stderr)
+        return None
+
+    def kernel(obs: List[float], last_action: int) -> int:
+        # The compiled kernel takes a float64 array rather than a Python list.
+        return int(compiled(np.asarray(obs, dtype=np.float64), last_action))
+
+    return kernel
+
+
+_kernel = _decide_action_kernel
+_until_jit = JIT_AFTER
+
+
+def _decide_action(obs: List[float], state: Dict[str, float]) -> int:
+    global _kernel, _until_jit
+    if _until_jit:
+        _until_jit -= 1
+        if not _until_jit:
+            _kernel = _jit_kernel() or _kernel
+
+    target_action = _kernel(obs, int(state.get("last_action", 1)))
     state["last_action"] = target_action
-    return int(target_action)
+    return target_action
 
 
 def _handle_command(payload: Dict[str, object], state: Dict[str, float]) -> Tuple[bool, Dict[str, object]]:
@@ -128,25 +171,68 @@ def _handle_command(payload: Dict[str, object], state: Dict[str, float]) -> Tupl
     return True, {"action": action}
 
 
-def main() -> None:
-    state: Dict[str, float] = {}
-    for raw_line in sys.stdin:
-        line = raw_line.strip()
-        if not line:
-            continue
+def _read_batches(max_lines: int = MAX_BATCH) -> Iterator[List[bytes]]:
+    """Yield stdin lines in groups, coalescing whatever the driver has already sent.
 
-        try:
-            payload = json.loads(line)
-        except json.JSONDecodeError:
-            print(json.dumps({"error": "invalid_json"}), flush=True)
-            continue
+    Blocks only until at least one complete line is available and never waits to
+    fill a batch, so a strict request/response driver still gets one reply per line.
+    """
+    fd = sys.stdin.fileno()
+    buffered = b""
+    while True:
+        chunk = os.read(fd, READ_CHUNK)
+        buffered += chunk
+        while chunk and buffered.count(b"\n") < max_lines and select.select([fd], [], [], 0)[0]:
+            chunk = os.read(fd, READ_CHUNK)
+            buffered += chunk
 
-        success, response = _handle_command(payload, state)
-        print(json.dumps(response), flush=True)
+        eof = not chunk
+        lines = buffered.split(b"\n")
+        buffered = lines.pop()
+        if eof and buffered:
+            lines.append(buffered)
 
-        if not success:
-            # If something went wrong, keep the state consistent but do not exit.
-            continue
+        for start in range(0, len(lines), max_lines):
+            yield lines[start:start + max_lines]
+        if eof:
+            return
+
+
+def _write_responses(responses: List[Dict[str, object]]) -> None:
+    # Bytes straight to the underlying buffer: no str decode/encode round trip.
+    out = sys.stdout.buffer
+    out.write(b"".join(orjson.dumps(response, option=orjson.OPT_APPEND_NEWLINE) for response in responses))
+    out.flush()
+
+
+def main() -> None:
+    state: Dict[str, float] = {}
+    for lines in _read_batches():
+        # Decisions depend on the previous action, so lines are still evaluated in
+        # order; batching only amortises the stdin reads and stdout flushes.
+        responses: List[Dict[str, object]] = []
+        for raw_line in lines:
+            line = raw_line.strip()
+            if not line:
+                continue
+
+            try:
+                payload = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                responses.append({"error": "invalid_json"})
+                continue
+            # Valid JSON that is not an object (e.g. [1, 2]) is not a request either; it
+            # must still get its own reply, or the rest of the batch would be lost with it.
+            if not isinstance(payload, dict):
+                responses.append({"error": "invalid_json"})
+                continue
+
+            # On failure the state is left untouched and the error is reported.
+            _, response = _handle_command(payload, state)
+            responses.append(response)
+
+        if responses:
+            _write_responses(responses)
 
 
 if __name__ == "__main__":
@@ -47,11 +47,10 @@ class reccurentActor(nn.Module):
         self.action_net = nn.Linear(128, action_dim)
 
     def init_hidden(self, batch_size=1, device="cpu"):
-        h = torch.zeros(1, batch_size, 256).to(device)
-        c = torch.zeros(1, batch_size, 256).to(device)
+        # The model itself is placed on its device by set_initial_state.
+        h = torch.zeros(1, batch_size, 256, device=device)
+        c = torch.zeros(1, batch_size, 256, device=device)
 
-        self.to(device)
-        
         return (h, c)
     
     def forward(self, obs, hidden):
@@ -80,6 +79,20 @@ class reccurentActor(nn.Module):
         action = dist.sample()
         log_prob = dist.log_prob(action)
         return action, log_prob, new_hidden
+
+    def act_deterministic(self, obs, hidden, device = "cpu"):
+        # Greedy action for streaming inference: no Categorical, no log_prob.
+        if isinstance(obs, np.ndarray):
+            obs = torch.as_tensor(obs, dtype=torch.float32, device=device)
+        elif not torch.is_tensor(obs):
+            obs = torch.tensor(obs, dtype=torch.float32, device=device)
+
+        with torch.no_grad():
+            logits, new_hidden = self.forward(obs, hidden)
+
+        if logits.shape[0] != 1:
+            raise ValueError(f"act_deterministic expects a batch of 1, got {logits.shape[0]}")
+        return int(logits[0, -1].argmax().item()), new_hidden
     
     def set_initial_state(self, file_path, device = "cpu"):
         state = torch.load(file_path, map_location = device)
@@ -1,73 +1,87 @@
 #!/usr/bin/env python3
-import json
-import statistics
+import heapq
+from array import array
+
+import numpy as np
+import orjson
+
+APY_FIELDS = ('vault', 'hold', 'diff')
 
 def load_jsonl(filename):
-    """Load JSONL file and return list of JSON objects"""
-    results = []
-    with open(filename, 'r') as f:
+    """Stream a JSONL results file, keeping only the fields the analysis uses.
+
+    Returns (ok_mask, apys, keyed): a bool array over all records, an (N_ok, 3) array
+    of vault/hold/diff APYs for successful runs, and a dict mapping each successful
+    run's key to (vault, hold, diff, charm, dlv) where charm is
+    (wideThreshold, baseThreshold) and dlv is
+    (deviationThresholdAbove, deviationThresholdBelow).
+    """
+    ok_flags = []
+    apys = array('d')
+    keyed = {}
+    with open(filename, 'rb') as f:
         for line in f:
-            if line.strip():
-                results.append(json.loads(line.strip()))
-    return results
+            if not line.strip():
+                continue
+            r = orjson.loads(line)
+            ok_flags.append(bool(r['ok']))
+            if not r['ok']:
+                continue
 
-def analyze_results(results):
-    """Extract APY metrics from results"""
-    successful_results = [r for r in results if r['ok']]
-    
-    vault_apys = [r['apy']['vault'] for r in successful_results]
-    hold_apys = [r['apy']['hold'] for r in successful_results]
-    diff_apys = [r['apy']['diff'] for r in successful_results]
-    
-    return {
-        'count': len(successful_results),
-        'vault_apy': {
-            'mean': statistics.mean(vault_apys),
-            'median': statistics.median(vault_apys),
-            'min': min(vault_apys),
-            'max': max(vault_apys),
-            'stddev': statistics.stdev(vault_apys) if len(vault_apys) > 1 else 0
-        },
-        'hold_apy': {
-            'mean': statistics.mean(hold_apys),
-            'median': statistics.median(hold_apys),
-            'min': min(hold_apys),
-            'max': max(hold_apys),
-            'stddev': statistics.stdev(hold_apys) if len(hold_apys) > 1 else 0
-        },
-        'diff_apy': {
-            'mean': statistics.mean(diff_apys),
-            'median': statistics.median(diff_apys),
-            'min': min(diff_apys),
-            'max': max(diff_apys),
-            'stddev': statistics.stdev(diff_apys) if len(diff_apys) > 1 else 0
+            apy, charm, dlv = r['apy'], r['charm'], r['dlv']
+            vault, hold, diff = apy['vault'], apy['hold'], apy['diff']
+            apys.extend((vault, hold, diff))
+            keyed[r['key']] = (
+                vault,
+                hold,
+                diff,
+                (charm['wideThreshold'], charm['baseThreshold']),
+                (dlv['deviationThresholdAbove'], dlv['deviationThresholdBelow'])
+            )
+
+    ok_mask = np.array(ok_flags, dtype=bool)
+    return ok_mask, np.frombuffer(apys, dtype=np.float64).reshape(-1, len(APY_FIELDS)), keyed
+
+def analyze_results(apys):
+    """Extract APY metrics from an (N, 3) vault/hold/diff APY array, reduced column-wise"""
+    count = len(apys)
+    means = apys.mean(axis=0)
+    medians = np.median(apys, axis=0)
+    mins = apys.min(axis=0)
+    maxs = apys.max(axis=0)
+    stddevs = apys.std(axis=0, ddof=1) if count > 1 else np.zeros(len(APY_FIELDS))
+
+    stats = {'count': count}
+    for i, field in enumerate(APY_FIELDS):
+        stats[f'{field}_apy'] = {
+            'mean': float(means[i]),
+            'median': float(medians[i]),
+            'min': float(mins[i]),
+            'max': float(maxs[i]),
+            'stddev': float(stddevs[i])
         }
-    }
+    return stats
 
 def compare_same_combinations(disabled_results, enabled_results):
     """Compare APY changes for the same parameter combinations"""
-    # Create dictionaries keyed by combination key
-    disabled_dict = {r['key']: r for r in disabled_results if r['ok']}
-    enabled_dict = {r['key']: r for r in enabled_results if r['ok']}
-    
     # Find common keys
-    common_keys = set(disabled_dict.keys()) & set(enabled_dict.keys())
+    common_keys = disabled_results.keys() & enabled_results.keys()
     
     comparisons = []
     for key in common_keys:
-        disabled = disabled_dict[key]
-        enabled = enabled_dict[key]
+        disabled_vault, disabled_hold, disabled_diff, charm, dlv = disabled_results[key]
+        enabled_vault, enabled_hold, enabled_diff, _, _ = enabled_results[key]
         
-        vault_change = enabled['apy']['vault'] - disabled['apy']['vault']
-        hold_change = enabled['apy']['hold'] - disabled['apy']['hold']
-        diff_change = enabled['apy']['diff'] - disabled['apy']['diff']
+        vault_change = enabled_vault - disabled_vault
+        hold_change = enabled_hold - disabled_hold
+        diff_change = enabled_diff - disabled_diff
         
         comparisons.append({
             'key': key,
-            'charm': disabled['charm'],
-            'dlv': disabled['dlv'],
-            'disabled_apy': disabled['apy'],
-            'enabled_apy': enabled['apy'],
+            'charm': charm,
+            'dlv': dlv,
+            'disabled_apy': {'vault': disabled_vault, 'hold': disabled_hold, 'diff': disabled_diff},
+            'enabled_apy': {'vault': enabled_vault, 'hold': enabled_hold, 'diff': enabled_diff},
             'vault_change': vault_change,
             'hold_change': hold_change,
             'diff_change': diff_change,
@@ -79,19 +93,19 @@ def compare_same_combinations(disabled_results, enabled_results):
 
 def main():
     print("Loading results...")
-    disabled_results = load_jsonl('brute-force-results_ai_disabled.jsonl')
-    enabled_results = load_jsonl('brute-force-results_ai_enabled_subset.jsonl')
+    disabled_ok, disabled_apys, disabled_results = load_jsonl('brute-force-results_ai_disabled.jsonl')
+    enabled_ok, enabled_apys, enabled_results = load_jsonl('brute-force-results_ai_enabled_subset.jsonl')
     
-    print(f"AI Disabled: {len(disabled_results)} total results")
-    print(f"AI Enabled: {len(enabled_results)} total results")
+    print(f"AI Disabled: {len(disabled_ok)} total results")
+    print(f"AI Enabled: {len(enabled_ok)} total results")
     
     # Analyze overall performance
     print("\n" + "="*60)
     print("OVERALL PERFORMANCE ANALYSIS")
     print("="*60)
     
-    disabled_stats = analyze_results(disabled_results)
-    enabled_stats = analyze_results(enabled_results)
+    disabled_stats = analyze_results(disabled_apys)
+    enabled_stats = analyze_results(enabled_apys)
     
     print(f"\nAI DISABLED ({disabled_stats['count']} successful runs):")
     print(f"  Vault APY: {disabled_stats['vault_apy']['mean']:.2f}% ± {disabled_stats['vault_apy']['stddev']:.2f}%")
@@ -120,41 +134,43 @@ def main():
     print(f"\nFound {len(comparisons)} matching combinations")
     
     if comparisons:
-        # Sort by biggest vault APY improvements
-        comparisons.sort(key=lambda x: x['vault_change'], reverse=True)
+        # Biggest vault APY improvements
+        top_improvements = heapq.nlargest(10, comparisons, key=lambda x: x['vault_change'])
         
         print(f"\nTOP 10 BIGGEST VAULT APY IMPROVEMENTS:")
         print("-" * 80)
-        for i, comp in enumerate(comparisons[:10]):
+        for i, comp in enumerate(top_improvements):
             print(f"{i+1:2d}. Key: {comp['key']}")
             print(f"    Vault APY: {comp['disabled_apy']['vault']:.2f}% → {comp['enabled_apy']['vault']:.2f}% ({comp['vault_change']:+.2f}%)")
             print(f"    Diff APY:  {comp['disabled_apy']['diff']:.2f}% → {comp['enabled_apy']['diff']:.2f}% ({comp['diff_change']:+.2f}%)")
-            print(f"    Config: wideThreshold={comp['charm']['wideThreshold']}, baseThreshold={comp['charm']['baseThreshold']}")
-            print(f"            devAbove={comp['dlv']['deviationThresholdAbove']}, devBelow={comp['dlv']['deviationThresholdBelow']}")
+            print(f"    Config: wideThreshold={comp['charm'][0]}, baseThreshold={comp['charm'][1]}")
+            print(f"            devAbove={comp['dlv'][0]}, devBelow={comp['dlv'][1]}")
             print()
         
-        # Sort by biggest absolute vault APY changes
-        comparisons.sort(key=lambda x: x['abs_vault_change'], reverse=True)
+        # Biggest absolute vault APY changes
+        top_abs_changes = heapq.nlargest(10, comparisons, key=lambda x: x['abs_vault_change'])
         
         print(f"\nTOP 10 BIGGEST ABSOLUTE VAULT APY CHANGES:")
         print("-" * 80)
-        for i, comp in enumerate(comparisons[:10]):
+        for i, comp in enumerate(top_abs_changes):
             print(f"{i+1:2d}. Key: {comp['key']}")
             print(f"    Vault APY: {comp['disabled_apy']['vault']:.2f}% → {comp['enabled_apy']['vault']:.2f}% ({comp['vault_change']:+.2f}%)")
             print(f"    Diff APY:  {comp['disabled_apy']['diff']:.2f}% → {comp['enabled_apy']['diff']:.2f}% ({comp['diff_change']:+.2f}%)")
-            print(f"    Config: wideThreshold={comp['charm']['wideThreshold']}, baseThreshold={comp['charm']['baseThreshold']}")
-            print(f"            devAbove={comp['dlv']['deviationThresholdAbove']}, devBelow={comp['dlv']['deviationThresholdBelow']}")
+            print(f"    Config: wideThreshold={comp['charm'][0]}, baseThreshold={comp['charm'][1]}")
+            print(f"            devAbove={comp['dlv'][0]}, devBelow={comp['dlv'][1]}")
             print()
         
         # Summary statistics of changes
-        vault_changes = [c['vault_change'] for c in comparisons]
-        diff_changes = [c['diff_change'] for c in comparisons]
+        vault_changes = np.array([c['vault_change'] for c in comparisons], dtype=np.float64)
+        diff_changes = np.array([c['diff_change'] for c in comparisons], dtype=np.float64)
+        vault_positive = int((vault_changes > 0).sum())
+        diff_positive = int((diff_changes > 0).sum())
         
         print(f"\nCHANGE STATISTICS (across {len(comparisons)} matching combinations):")
-        print(f"  Vault APY Change: {statistics.mean(vault_changes):.2f}% ± {statistics.stdev(vault_changes):.2f}%")
-        print(f"  Diff APY Change:  {statistics.mean(diff_changes):.2f}% ± {statistics.stdev(diff_changes):.2f}%")
-        print(f"  Positive vault changes: {sum(1 for c in vault_changes if c > 0)}/{len(vault_changes)} ({sum(1 for c in vault_changes if c > 0)/len(vault_changes)*100:.1f}%)")
-        print(f"  Positive diff changes:  {sum(1 for c in diff_changes if c > 0)}/{len(diff_changes)} ({sum(1 for c in diff_changes if c > 0)/len(diff_changes)*100:.1f}%)")
+        print(f"  Vault APY Change: {vault_changes.mean():.2f}% ± {vault_changes.std(ddof=1):.2f}%")
+        print(f"  Diff APY Change:  {diff_changes.mean():.2f}% ± {diff_changes.std(ddof=1):.2f}%")
+        print(f"  Positive vault changes: {vault_positive}/{len(vault_changes)} ({vault_positive/len(vault_changes)*100:.1f}%)")
+        print(f"  Positive diff changes:  {diff_positive}/{len(diff_changes)} ({diff_positive/len(diff_changes)*100:.1f}%)")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file